@@ -1,15 +1,62 @@
 import streamlit as st
 import json
+import operator
 import re
-from typing import List, Dict
+from typing import List, Dict, Iterator, NamedTuple, Optional, Tuple
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Matches only the header prefix; the question body is sliced off at m.end()
+# so no greedy tail is left for the engine to backtrack through.
+# Case is spelled out in character classes rather than using re.IGNORECASE.
+_Q_PREFIX = re.compile(r"^(?:\d+[.)]|[Qq](?:[Uu][Ee][Ss][Tt][Ii][Oo][Nn])?\s*(?::|\d+[.):]?))\s*")
+_OPT_CHARS = frozenset("abcdABCD1234")
+_CORRECT = re.compile(r"\*|\[CORRECT\]|✓", re.IGNORECASE)
+PREVIEW_PAGE_SIZE = 20
+# (is_user_answer, is_correct_answer) -> how a submitted option is rendered
+_OPTION_STYLES = {
+    (True, True): (st.success, "✅ "),
+    (True, False): (st.error, "❌ "),
+    (False, True): (st.success, "✅ "),
+    (False, False): (st.write, ""),
+}
+
+class Question(NamedTuple):
+    question: str
+    options: Tuple[str, ...]
+    correct_answer: str
 
 def initialize_session_state():
+    # Questions are immutable once added: a tuple of Question records
     if 'questions' not in st.session_state:
-        st.session_state.questions = []
+        st.session_state.questions = ()
+    # Compact JSON of questions, rebuilt only when the questions change
+    if 'export_blob' not in st.session_state:
+        st.session_state.export_blob = _export_blob(st.session_state.questions)
     if 'current_question_index' not in st.session_state:
         st.session_state.current_question_index = 0
+    # Answers are kept as lists parallel to questions, indexed by question number
     if 'user_answers' not in st.session_state:
-        st.session_state.user_answers = {}
+        st.session_state.user_answers = []
+    if 'correct_answers' not in st.session_state:
+        st.session_state.correct_answers = []
+    if 'submitted_flags' not in st.session_state:
+        st.session_state.submitted_flags = []
+    # (user_idx, correct_idx) into each question's options, set on submit
+    if 'answer_indices' not in st.session_state:
+        st.session_state.answer_indices = []
+    # (question, correct_answer) pairs already added, used to skip duplicates
+    if 'question_keys' not in st.session_state:
+        st.session_state.question_keys = set()
+    # file_id of the last JSON upload imported, so it isn't re-imported on rerun
+    if 'imported_file_id' not in st.session_state:
+        st.session_state.imported_file_id = None
+    if 'preview_limit' not in st.session_state:
+        st.session_state.preview_limit = PREVIEW_PAGE_SIZE
     if 'quiz_started' not in st.session_state:
         st.session_state.quiz_started = False
     if 'quiz_completed' not in st.session_state:
@@ -17,111 +64,211 @@ def initialize_session_state():
     if 'submitted' not in st.session_state:
         st.session_state.submitted = False
 
-def parse_questions(text: str) -> List[Dict]:
-    questions = []
+def parse_questions(text: str) -> Iterator[Dict]:
     current_question = None
     current_options = []
     correct_answer = None
+    numbered_options = False
+    q_prefix_match = _Q_PREFIX.match
+    correct_subn = _CORRECT.subn
 
-    for line in text.split('\n'):
-        line = line.strip()
-        if not line:
+    for line in text.splitlines():
+        if not line or line.isspace():
             continue
+        if line[0].isspace() or line[-1].isspace():
+            line = line.strip()
+
+        is_option = len(line) >= 2 and line[1] == ')' and line[0] in _OPT_CHARS
+        # "1)" can label either a question or an option; it is an option only when
+        # it is the next number in an open question whose options are numbered.
+        if is_option and (not line[0].isdigit() or (
+                current_question
+                and (numbered_options or not current_options)
+                and int(line[0]) == len(current_options) + 1)):
+            question_match = None
+        else:
+            question_match = q_prefix_match(line)
 
-        if re.match(r"^\d+[\.\)]|^(Q|Question)\s*[:\d]", line, re.IGNORECASE):
+        if question_match:
             if current_question and current_options and correct_answer:
-                questions.append({
+                yield {
                     "question": current_question,
                     "options": [opt[0] for opt in current_options],
                     "correct_answer": correct_answer
-                })
-            current_question = re.sub(r"^(Q(uestion)?[:\s]*\d*\.?)|\d+[\.\)]", "", line, flags=re.IGNORECASE).strip()
+                }
+            current_question = line[question_match.end():]
             current_options = []
             correct_answer = None
 
-        elif re.match(r"^[a-d1-4A-D]\)", line):
+        elif is_option:
+            numbered_options = line[0].isdigit()
             option_text = line[2:].strip()
-            is_correct = bool(re.search(r'\*|\[CORRECT\]|\✓', option_text, re.IGNORECASE))
-            clean_text = re.sub(r'\*|\[CORRECT\]|\✓', '', option_text).strip()
+            clean_text, marker_count = correct_subn('', option_text)
+            clean_text = clean_text.strip()
+            is_correct = marker_count > 0
             current_options.append((clean_text, is_correct))
             if is_correct:
                 correct_answer = clean_text
 
     if current_question and current_options and correct_answer:
-        questions.append({
+        yield {
             "question": current_question,
             "options": [opt[0] for opt in current_options],
             "correct_answer": correct_answer
-        })
-
-    return questions
+        }
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _parse_cached(text: str) -> List[Dict]:
+    # cache_data hands back a fresh copy per call, so callers may mutate it
+    return list(parse_questions(text))
+
+def _export_blob(questions: Tuple[Question, ...]) -> bytes:
+    return json.dumps([q._asdict() for q in questions], separators=(",", ":")).encode()
+
+def _is_valid_question(q) -> bool:
+    return (
+        isinstance(q, dict)
+        and isinstance(q.get("question"), str)
+        and isinstance(q.get("correct_answer"), str)
+        and isinstance(q.get("options"), list)
+        and len(q["options"]) > 0
+        and all(isinstance(opt, str) for opt in q["options"])
+        and q["correct_answer"] in q["options"]
+    )
+
+def validate_questions(data) -> Optional[str]:
+    # Returns an error message for the first problem found, or None if valid
+    if not isinstance(data, list):
+        return "Quiz JSON must be a list of questions."
+    bad = next((i for i, q in enumerate(data) if not _is_valid_question(q)), None)
+    if bad is not None:
+        return (f"Question {bad + 1} must have a text 'question', a non-empty list of text "
+                "'options' and a text 'correct_answer' that is one of the options.")
+    return None
+
+def extend_questions(new_questions: List[Dict]) -> int:
+    # Build every record before touching session state so a bad entry leaves it unchanged
+    seen = st.session_state.question_keys
+    new_keys = set()
+    unique = []
+    for q in new_questions:
+        record = Question(q["question"], tuple(q["options"]), q["correct_answer"])
+        key = (record.question, record.correct_answer)
+        if key in seen or key in new_keys:
+            continue
+        new_keys.add(key)
+        unique.append(record)
+
+    seen.update(new_keys)
+    st.session_state.questions += tuple(unique)
+    if unique:
+        st.session_state.export_blob = _export_blob(st.session_state.questions)
+    st.session_state.correct_answers.extend(q.correct_answer for q in unique)
+    st.session_state.user_answers.extend([None] * len(unique))
+    st.session_state.submitted_flags.extend([False] * len(unique))
+    st.session_state.answer_indices.extend([None] * len(unique))
+    return len(unique)
+
+def added_message(verb: str, added: int, total: int) -> str:
+    message = f"{verb} {added} question(s)!"
+    if added < total:
+        message += f" Skipped {total - added} duplicate(s)."
+    return message
 
 def add_questions_from_text(text: str):
-    questions = parse_questions(text)
+    questions = _parse_cached(text)
     if not questions:
         st.warning("No valid questions with correct answers found.")
         return False
-    st.session_state.questions.extend(questions)
+    added = extend_questions(questions)
+    if not added:
+        st.warning("All of these questions have already been added.")
+        return False
+    # Shown after the rerun that follows a successful add
+    st.session_state.flash = added_message("Added", added, len(questions))
     return True
 
-def display_question(question_data: Dict, question_num: int):
+def display_question(question_data: Question, question_num: int):
     st.subheader(f"Question {question_num + 1}")
-    st.write(question_data["question"])
+    st.write(question_data.question)
 
     key_prefix = f"q_{question_num}"
     user_answer_key = f"{key_prefix}_user_answer"
-    submitted_key = f"{key_prefix}_submitted"
 
-    if submitted_key not in st.session_state:
-        st.session_state[submitted_key] = False
-
-    if not st.session_state[submitted_key]:
+    if not st.session_state.submitted_flags[question_num]:
         selected_option = st.radio(
             "Select your answer:",
-            options=question_data["options"],
+            options=question_data.options,
             index=None,
             key=user_answer_key
         )
 
         if selected_option is not None:
             if st.button("✅ Submit Answer", key=f"{key_prefix}_submit"):
+                options = question_data.options
+                correct_ans = question_data.correct_answer
+                correct_idx = options.index(correct_ans) if correct_ans in options else -1
                 st.session_state.submitted = True
-                st.session_state[submitted_key] = True
+                st.session_state.submitted_flags[question_num] = True
                 st.session_state.user_answers[question_num] = selected_option
+                st.session_state.answer_indices[question_num] = (options.index(selected_option), correct_idx)
                 st.rerun()
     else:
-        user_ans = st.session_state.user_answers.get(question_num)
-        correct_ans = question_data["correct_answer"]
-
-        for opt in question_data["options"]:
-            if opt == user_ans and opt == correct_ans:
-                st.success(f"✅ {opt}")
-            elif opt == user_ans and opt != correct_ans:
-                st.error(f"❌ {opt}")
-            elif opt == correct_ans:
-                st.success(f"✅ {opt}")
-            else:
-                st.write(opt)
+        user_idx, correct_idx = st.session_state.answer_indices[question_num]
+
+        for i, opt in enumerate(question_data.options):
+            render, prefix = _OPTION_STYLES[i == user_idx, i == correct_idx]
+            render(f"{prefix}{opt}")
 
         st.info("Click 'Next' to continue.")
 
 
 def calculate_score():
-    score = 0
-    for i, question in enumerate(st.session_state.questions):
-        if st.session_state.user_answers.get(i) == question["correct_answer"]:
-            score += 1
-    return score
+    return sum(map(operator.eq, st.session_state.user_answers, st.session_state.correct_answers))
 
 def reset_quiz():
-    st.session_state.quiz_started = False
-    st.session_state.quiz_completed = False
-    st.session_state.current_question_index = 0
-    st.session_state.user_answers = {}
-    st.session_state.submitted = False
-    # Reset per-question submission flags
-    for i in range(len(st.session_state.questions)):
-        st.session_state[f"q_{i}_submitted"] = False
+    state = {
+        "quiz_started": False,
+        "quiz_completed": False,
+        "current_question_index": 0,
+        "user_answers": [None] * len(st.session_state.questions),
+        "answer_indices": [None] * len(st.session_state.questions),
+        "submitted_flags": [False] * len(st.session_state.questions),
+        "submitted": False,
+    }
+    st.session_state.update(state)
+
+def show_more_preview():
+    st.session_state.preview_limit += PREVIEW_PAGE_SIZE
+
+@st.fragment
+def render_preview():
+    questions = st.session_state.questions
+    shown = questions[:st.session_state.preview_limit]
+    st.markdown("\n\n".join(
+        f"**{i+1}. {q.question}**\n\n"
+        f"Options: {', '.join(q.options)}\n\n"
+        f"✅ Correct: {q.correct_answer}\n\n"
+        "---"
+        for i, q in enumerate(shown)
+    ))
+    remaining = len(questions) - len(shown)
+    if remaining > 0:
+        st.button(f"Show more ({remaining} remaining)", on_click=show_more_preview)
+
+@st.fragment
+def render_review():
+    blocks = []
+    answers = zip(st.session_state.questions, st.session_state.user_answers, st.session_state.correct_answers)
+    for i, (q, user_answer, correct_answer) in enumerate(answers):
+        correct = user_answer == correct_answer
+        if user_answer is None:
+            user_answer = "Not answered"
+        block = f"**Q{i+1}:** {q.question}\n\n- Your answer: `{user_answer}` {'✅' if correct else '❌'}"
+        if not correct:
+            block += f"\n- Correct answer: `{correct_answer}`"
+        blocks.append(block + "\n\n---")
+    st.markdown("\n\n".join(blocks))
 
 def main():
     st.title("📚 Quiz Generator & Player")
@@ -132,6 +279,7 @@ def main():
         question_text = st.text_area(
             "Enter your questions:",
             height=300,
+            key="question_text",
             help="""Use one of these formats:
 1. What is 2+2?
 a) 3
@@ -151,29 +299,46 @@ Question 3: Which is a fruit?
 
         if st.button("➕ Add Questions"):
             if add_questions_from_text(question_text):
-                st.success(f"Added {len(st.session_state.questions)} question(s)!")
+                # Clear the input so the added text isn't kept around for later reruns
+                del st.session_state.question_text
                 st.rerun()
 
+        flash = st.session_state.pop("flash", None)
+        if flash:
+            st.success(flash)
+
         if st.session_state.questions:
             st.download_button(
                 label="⬇️ Export Questions",
-                data=json.dumps(st.session_state.questions, indent=2),
+                data=st.session_state.export_blob,
                 file_name="quiz_questions.json",
                 mime="application/json"
             )
 
             uploaded_file = st.file_uploader("📤 Import Quiz (JSON)", type="json")
-            if uploaded_file:
+            if uploaded_file and uploaded_file.file_id != st.session_state.imported_file_id:
                 try:
-                    data = json.load(uploaded_file)
-                    st.session_state.questions.extend(data)
-                    st.success(f"Imported {len(data)} question(s)!")
-                    st.rerun()
+                    data = _json_loads(uploaded_file.getvalue())
+                    error = validate_questions(data)
+                    if error:
+                        st.error(error)
+                    else:
+                        st.session_state.imported_file_id = uploaded_file.file_id
+                        added = extend_questions(data)
+                        if added:
+                            st.session_state.flash = added_message("Imported", added, len(data))
+                            st.rerun()
+                        else:
+                            st.info("All questions in this file have already been imported.")
                 except json.JSONDecodeError:
                     st.error("Invalid JSON format.")
 
             if st.button("🗑 Clear All Questions"):
-                st.session_state.questions = []
+                st.session_state.questions = ()
+                st.session_state.export_blob = _export_blob(())
+                st.session_state.correct_answers = []
+                st.session_state.question_keys = set()
+                st.session_state.preview_limit = PREVIEW_PAGE_SIZE
                 reset_quiz()
                 st.rerun()
 
@@ -190,24 +355,19 @@ Question 3: Which is a fruit?
             st.rerun()
 
         st.subheader("Preview of Questions")
-        for i, q in enumerate(st.session_state.questions):
-            st.markdown(f"**{i+1}. {q['question']}**")
-            st.write(f"Options: {', '.join(q['options'])}")
-            st.write(f"✅ Correct: {q['correct_answer']}")
-            st.write("---")
+        render_preview()
     else:
         if st.session_state.current_question_index < len(st.session_state.questions):
             current_question = st.session_state.questions[st.session_state.current_question_index]
             display_question(current_question, st.session_state.current_question_index)
 
-            submitted_key = f"q_{st.session_state.current_question_index}_submitted"
             col1, col2 = st.columns(2)
             if st.session_state.current_question_index > 0:
                 if col1.button("⬅ Previous"):
                     st.session_state.current_question_index -= 1
                     st.rerun()
 
-            if st.session_state.get(submitted_key, False):
+            if st.session_state.submitted_flags[st.session_state.current_question_index]:
                 if st.session_state.current_question_index < len(st.session_state.questions) - 1:
                     if col2.button("Next ➡"):
                         st.session_state.current_question_index += 1
@@ -226,14 +386,7 @@ Question 3: Which is a fruit?
         st.success(f"🎉 You scored **{score}/{total}** ({score / total * 100:.1f}%)")
 
         st.subheader("🧐 Answer Review")
-        for i, q in enumerate(st.session_state.questions):
-            user_answer = st.session_state.user_answers.get(i, "Not answered")
-            correct = user_answer == q["correct_answer"]
-            st.markdown(f"**Q{i+1}:** {q['question']}")
-            st.write(f"- Your answer: `{user_answer}` {'✅' if correct else '❌'}")
-            if not correct:
-                st.write(f"- Correct answer: `{q['correct_answer']}`")
-            st.write("---")
+        render_review()
 
         if st.button("🔁 Retake Quiz"):
             reset_quiz()
@@ -0,0 +1,106 @@
+import json
+
+import pytest
+import streamlit as st
+
+from quiz_app import extend_questions, initialize_session_state, parse_questions, validate_questions
+
+HELP_TEXT = """1. What is 2+2?
+a) 3
+b) 4 [CORRECT]
+c) 5
+
+Q: Capital of France?
+a) London
+b) Paris *
+c) Berlin
+
+Question 3: Which is a fruit?
+1) Apple ✓
+2) Carrot
+3) Potato"""
+
+
+def test_parses_help_examples():
+    assert list(parse_questions(HELP_TEXT)) == [
+        {"question": "What is 2+2?", "options": ["3", "4", "5"], "correct_answer": "4"},
+        {"question": "Capital of France?", "options": ["London", "Paris", "Berlin"], "correct_answer": "Paris"},
+        {"question": "Which is a fruit?", "options": ["Apple", "Carrot", "Potato"], "correct_answer": "Apple"},
+    ]
+
+
+def test_keeps_digits_in_question_body():
+    headers = {
+        "Q: 100 divided by 4?": "100 divided by 4?",
+        "Q: 2+2 = ?": "2+2 = ?",
+        "Question: 3.14 is pi?": "3.14 is pi?",
+        "Q1. Is 2.5 > 2?": "Is 2.5 > 2?",
+        "4. Is 2.5 > 2?": "Is 2.5 > 2?",
+    }
+    for header, expected in headers.items():
+        questions = list(parse_questions(f"{header}\na) yes *\nb) no"))
+        assert [q["question"] for q in questions] == [expected]
+
+
+def test_numbered_questions_and_options():
+    assert list(parse_questions("1) Skipped question?\n2) Real question?\na) x *\nb) y")) == [
+        {"question": "Real question?", "options": ["x", "y"], "correct_answer": "x"},
+    ]
+    text = "1) Which is a fruit?\n1) Apple ✓\n2) Carrot\n2) Which is red?\n1) Sky\n2) Blood ✓"
+    assert list(parse_questions(text)) == [
+        {"question": "Which is a fruit?", "options": ["Apple", "Carrot"], "correct_answer": "Apple"},
+        {"question": "Which is red?", "options": ["Sky", "Blood"], "correct_answer": "Blood"},
+    ]
+    text = "1) First?\na) x *\n2) Second?\na) y *"
+    assert [q["question"] for q in parse_questions(text)] == ["First?", "Second?"]
+
+
+def test_crlf_input():
+    assert list(parse_questions(HELP_TEXT.replace("\n", "\r\n"))) == list(parse_questions(HELP_TEXT))
+
+
+def test_validate_questions_rejects_malformed_entries():
+    good = {"question": "A", "options": ["x", "y"], "correct_answer": "x"}
+    assert validate_questions([good]) is None
+    assert validate_questions({"question": "A"}) == "Quiz JSON must be a list of questions."
+    malformed = [
+        {"question": "B", "options": None, "correct_answer": "y"},
+        {"question": ["B"], "options": ["y"], "correct_answer": "y"},
+        {"question": "B", "options": "abc", "correct_answer": "a"},
+        {"question": "B", "options": [], "correct_answer": "y"},
+        {"question": "B", "options": ["y", 2], "correct_answer": "y"},
+        {"question": "B", "options": ["y"], "correct_answer": None},
+        {"question": "B", "options": ["y"]},
+        {"question": "B", "options": ["x", "y"], "correct_answer": "z"},
+        "B",
+    ]
+    errors = {validate_questions([good, bad]) for bad in malformed}
+    assert len(errors) == 1
+    assert errors.pop().startswith("Question 2 ")
+
+
+@pytest.fixture
+def session_state():
+    st.session_state.clear()
+    initialize_session_state()
+    yield st.session_state
+    st.session_state.clear()
+
+
+def test_extend_questions_failure_leaves_state_unchanged(session_state):
+    good = {"question": "A", "options": ["x", "y"], "correct_answer": "x"}
+    with pytest.raises(TypeError):
+        extend_questions([good, {"question": "B", "options": None, "correct_answer": "y"}])
+    assert session_state.question_keys == set()
+    assert session_state.questions == ()
+
+    assert extend_questions([good, good]) == 1
+    assert extend_questions([good]) == 0
+    assert len(session_state.questions) == len(session_state.user_answers) == 1
+
+
+def test_export_blob_tracks_ingest(session_state):
+    good = {"question": "A", "options": ["x", "y"], "correct_answer": "x"}
+    assert session_state.export_blob == b"[]"
+    extend_questions([good])
+    assert json.loads(session_state.export_blob) == [good]